@@ -32,41 +32,42 @@ def tutordist(x, y):
     return result
 
 
-def PAM_Build(d, k):
+def PAM_Build(d, k, w=None):
     ''' BUILD phase for PAM Clustering algorithm
 
     Args:
         d : array of shape(n_objects, n_objects) - matrix of pairwise distances
         k : desired num of clusters
+        w : array of size n_objects - weights of objects, default - all ones
 
     Returns:
         S : set of numbers of medoids
         U : set of numbers of non-medoids
         C : array of size n_objects - cluster labels for each point
         d_nearest : array of size n_objects - distances to closest medoids
-        totalDistance : sum of distances from points to their medoids
+        totalDistance : weighted sum of distances from points to their medoids
     '''
     n_objects = d.shape[0]
+    if w is None:
+        w = np.ones(n_objects, dtype=np.int64)
     S = set()
     U = set(range(n_objects))
 
-    s = np.argmin(np.sum(d, axis=1))  # first medoid
+    s = int(np.argmin(d @ w))  # first medoid
     S.add(s)
     U.remove(s)
-    C = np.array([s for i in range(n_objects)])
-    d_nearest = np.array([d[i, s] for i in range(n_objects)])
-    totalDistance = np.sum(d_nearest)
+    C = np.full(n_objects, s)
+    d_nearest = d[:, s].copy()
+    totalDistance = np.sum(w * d_nearest)
 
     while len(S) < k:
         diff_TD_best, m_best = None, None
         for unselected in U:  # unselected candidate to become a medoid
             diff_TD = 0  # evaluate difference in total distance
-            for element in U:
-                if element == unselected:
-                    continue
+            for element in U:  # candidate itself gains its whole distance
                 delta = d[unselected, element] - d_nearest[element]
                 if delta < 0:
-                    diff_TD += delta
+                    diff_TD += w[element] * delta
             if diff_TD_best is None or diff_TD < diff_TD_best:
                 diff_TD_best = diff_TD  # take best difference
                 m_best = unselected
@@ -81,7 +82,8 @@ def PAM_Build(d, k):
     return S, U, C, d_nearest, totalDistance
 
 
-def PAM_Search(d, C, d_nearest, d_second, S, U, totalDistance, maxIter):
+def PAM_Search(d, C, d_nearest, d_second, S, U, totalDistance, maxIter,
+               w=None):
     '''SWAP Phase for PAM Clustering
 
     Args:
@@ -91,15 +93,18 @@ def PAM_Search(d, C, d_nearest, d_second, S, U, totalDistance, maxIter):
         d_second : array of size n_objects - distances to second closest
         S : set of numbers of medoids
         U : set of numbers of non-medoids
-        totalDistance : sum of distances from points to their medoids
+        totalDistance : weighted sum of distances from points to their medoids
         maxIter : maximum iterations in SWAP phase
+        w : array of size n_objects - weights of objects, default - all ones
 
     Returns:
         S : set of numbers of medoids
         C : list of size n_objects - cluster labels for each point
-        totalDistance : sum of distances from points to their medoids
+        totalDistance : weighted sum of distances from points to their medoids
     '''
     n_objects = d.shape[0]
+    if w is None:
+        w = np.ones(n_objects, dtype=np.int64)
     gets_better = True  # flag to continue
     iter_count = 0
 
@@ -116,18 +121,20 @@ def PAM_Search(d, C, d_nearest, d_second, S, U, totalDistance, maxIter):
 
         for non_medoid in U:
             delta = np.zeros(len(S))  # delta for each medoid (size k)
-            delta -= d_nearest[non_medoid]  # loss for making non-med a medoid
+            # loss for making non-med a medoid
+            delta -= w[non_medoid] * d_nearest[non_medoid]
             for other in range(n_objects):  # each point
                 if other == non_medoid:
                     continue
                 nearest = med2ord[C[other]]
 
                 # change for nearest
-                delta[nearest] += min(d[other, non_medoid],
-                                      d_second[other]) - d_nearest[other]
+                change = min(d[other, non_medoid],
+                             d_second[other]) - d_nearest[other]
+                delta[nearest] += w[other] * change
 
                 # change for non-nearest
-                change = d[other, non_medoid] - d_nearest[other]
+                change = w[other] * (d[other, non_medoid] - d_nearest[other])
                 if change < 0:
                     delta += change
                     delta[nearest] -= change  # already counted before
@@ -171,20 +178,128 @@ def PAM_Search(d, C, d_nearest, d_second, S, U, totalDistance, maxIter):
     return S, C, totalDistance
 
 
-def PAM(X, k, dist=tutordist, maxIter=10000):
+def PAM_Run(d, k, w=None, maxIter=10000):
+    '''BUILD and SWAP phases on a precomputed distance matrix
+
+    Args:
+        d : array of shape(n_objects, n_objects) - matrix of pairwise distances
+        k : desired number of clusters
+        w : array of size n_objects - weights of objects, default - all ones
+        maxIter : maximum iterations in SWAP phase
+
+    Returns:
+        S : set of numbers of medoids
+        C : array of size n_objects - cluster labels for each point
+        totalDistance : weighted sum of distances from points to their medoids
+    '''
+    n_objects = d.shape[0]
+
+    S, U, C, d_nearest, totalDistance = PAM_Build(d, k, w)  # see PAM_Build
+
+    if k > 1:
+        d_second = np.zeros(n_objects)  # distance to second nearest medoid
+        for i in range(n_objects):
+            tmp = d[i, np.array(list(S))]
+            d_second[i] = np.partition(tmp, 1)[1]
+
+        S, C, totalDistance = PAM_Search(d, C, d_nearest,
+                                         d_second, S, U,
+                                         totalDistance, maxIter, w)
+
+    return S, C, totalDistance
+
+
+def PAM_Quantize(img, k, maxIter=10000, maxColours=500):
+    '''PAM Clustering of image colours (manhattan distance in RGB)
+
+    Identical colours are merged into one object weighted by its number
+    of pixels, so PAM works on unique colours only. PAM needs a
+    (n_colours, n_colours) distance matrix and O(k * n_colours^2) time per
+    SWAP iteration, so if there are more than maxColours unique colours,
+    medoids are searched among maxColours of them sampled with
+    probability proportional to pixel count. Every pixel is then given
+    its closest medoid.
+
+    Args:
+        img : array of shape(height, width, n_channels) - RGB(A) image
+        k : desired number of colours
+        maxIter : maximum iterations in SWAP phase
+        maxColours : maximum number of unique colours clustered by PAM
+
+    Returns:
+        img_new : uint8 array of shape(height, width, 3) - clustered image
+        palette : uint8 array of shape(k, 3) - medoid colours
+        totalDistance : sum of distances from pixels to their medoids
+    '''
+    pixels = np.ascontiguousarray(img[:, :, :3], dtype=np.uint8)
+    pixels = pixels.reshape((-1, 3))  # get (n_pixels, 3)
+    colours, inverse, counts = np.unique(pixels, axis=0,
+                                         return_inverse=True,
+                                         return_counts=True)
+    n_colours = len(colours)
+
+    if n_colours > maxColours:
+        rng = np.random.RandomState(0)  # same image - same palette
+        sample = rng.choice(n_colours, maxColours, replace=False,
+                            p=counts / counts.sum())
+    else:
+        sample = np.arange(n_colours)
+
+    tmp = colours[sample].astype(np.int16)  # uint8 difference would overflow
+    d = np.sum(np.absolute(tmp[:, None, :] - tmp[None, :, :]), axis=2,
+               dtype=np.int64)
+
+    S, _, _ = PAM_Run(d, min(k, len(sample)), counts[sample], maxIter)
+    palette = colours[sample[sorted(S)]]
+
+    # distances from every unique colour to every medoid
+    tmp = colours.astype(np.int16)
+    d = np.sum(np.absolute(tmp[:, None, :] - palette[None, :, :]), axis=2,
+               dtype=np.int64)
+    C = np.argmin(d, axis=1)
+    totalDistance = np.sum(counts * d[np.arange(n_colours), C])
+
+    img_new = palette[C[inverse.ravel()]]  # medoid colour of each pixel
+    img_new = img_new.reshape(img.shape[:2] + (3,))
+    return img_new, palette, totalDistance
+
+
+def PAM(X, k, dist=tutordist, maxIter=10000, weights=None, dedup=False):
     '''The PAM Clustering algorithm
 
     Args:
         X : pandas dataframe of size (n_objects)
         k : desired number of clusters
-        dist : distance function, default - manhattan distance
+        dist : distance function, default - tutordist
         maxIter : maximum iterations in SWAP phase
+        weights : array of size n_objects - weights of objects,
+            default - all ones
+        dedup : True to merge identical rows into one weighted object,
+            or list of columns to compare rows by (e.g. ['mark'] for
+            tutordist), default - no merging
 
     Returns:
         med: list of medoids' indexes
         C : list of size n_objects - cluster labels for each point
-        totalDistance : sum of distances from points to their medoids
+        totalDistance : weighted sum of distances from points to their medoids
     '''
+    if weights is not None:
+        weights = np.asarray(weights)
+
+    if dedup is True:
+        cols = list(X.columns)
+    elif dedup is None or dedup is False:
+        cols = []
+    else:
+        cols = list(dedup)
+
+    if cols:
+        groups = X.groupby(cols, sort=False, dropna=False).ngroup()
+        groups = groups.to_numpy()  # unique object id for each row
+        _, first = np.unique(groups, return_index=True)  # representatives
+        weights = np.bincount(groups, weights=weights)
+        X = X.iloc[first].reset_index(drop=True)
+
     n_objects = len(X)
 
     tmp_d = [[0 for _ in range(n_objects)] for j in range(n_objects)]
@@ -194,19 +309,14 @@ def PAM(X, k, dist=tutordist, maxIter=10000):
 
     d = np.array(tmp_d)
 
-    S, U, C, d_nearest, totalDistance = PAM_Build(d, k)  # see PAM_Build
-
-    if k > 1:
-        d_second = np.zeros(n_objects)  # distance to second nearest medoid
-        for i in range(n_objects):
-            tmp = d[i, np.array(list(S))]
-            d_second[i] = np.partition(tmp, 1)[1]
+    S, C, totalDistance = PAM_Run(d, min(k, n_objects), weights,
+                                  maxIter)  # see PAM_Run
 
-        S, C, totalDistance = PAM_Search(d, C, d_nearest,
-                                         d_second, S, U,
-                                         totalDistance, maxIter)
+    if cols:  # back to original rows
+        S = first[sorted(S)]
+        C = first[C[groups]]
 
-    return list(S), C.tolist(), totalDistance
+    return [int(s) for s in S], C.tolist(), totalDistance
 
 
 if __name__ == "__main__":  # example
@@ -3,7 +3,7 @@ import matplotlib.pyplot as plt
 import os
 from glob import glob
 from PIL import Image
-from PAM import PAM
+from PAM import PAM_Quantize
 from time import time
 
 dir_path = os.path.dirname(os.path.realpath(__file__))
@@ -13,20 +13,13 @@ if not os.path.exists(new_test_dir):
     os.mkdir(new_test_dir)  # create dir for test results
 
 for img_path in glob(os.path.join(dir_path, 'imgs', '*')):  # get imgs
-    img = np.array(Image.open(img_path))[:, :, :3].astype('int64')
-    file_name = os.path.basename(img_path)
-    img_vectorised = img.reshape((-1, 3))  # get (n_pixels, 3)
+    img = np.array(Image.open(img_path))[:, :, :3].astype('uint8')
 
     start = time()
-    c, C, totalDist = PAM(img_vectorised, 3)  # 3 clusters, dist - manhattan
+    img_new, palette, totalDist = PAM_Quantize(img, 3)  # 3 clusters
     pam_time = time() - start
     print("PAM executed in %.6f" % pam_time)
 
-    img_new = np.zeros_like(img_vectorised)
-    for i in range(img_new.shape[0]):
-        img_new[i] = img_vectorised[C[i]]
-    img_new = img_new.reshape(img.shape).astype('uint8')  # clustered image
-
     img_name = "clustered_" + os.path.split(img_path)[-1]
     im = Image.fromarray(img_new).convert('RGB')
     im.save(os.path.join(new_test_dir, img_name))
@@ -0,0 +1,42 @@
+import numpy as np
+from PAM import PAM_Build, PAM_Run
+
+
+def true_cost(d, S, w):
+    '''Weighted sum of distances from points to their closest medoids'''
+    return np.sum(w * np.min(d[:, sorted(S)], axis=1))
+
+
+def run_test(n_tests, n_objects, k, maxIter=10000):
+    rng = np.random.RandomState(0)
+    for _ in range(n_tests):
+        x = rng.rand(n_objects, 2)  # 2d points, so distances have no ties
+        w = rng.randint(1, 5, size=n_objects)
+        x_rep = np.repeat(x, w, axis=0)  # one object per weight unit
+
+        d = np.linalg.norm(x[:, None, :] - x[None, :, :], axis=2)
+        d_rep = np.linalg.norm(x_rep[:, None, :] - x_rep[None, :, :], axis=2)
+
+        # BUILD on weighted objects costs the same as on expanded data
+        S, _, _, _, build_TD = PAM_Build(d, k, w)
+        S_rep, _, _, _, build_TD_rep = PAM_Build(d_rep, k)
+        assert np.isclose(build_TD, build_TD_rep)
+        assert np.isclose(build_TD, true_cost(d, S, w))
+
+        # so does the whole algorithm
+        S, _, total_TD = PAM_Run(d, k, w, maxIter)
+        S_rep, _, total_TD_rep = PAM_Run(d_rep, k, maxIter=maxIter)
+        assert np.isclose(total_TD, true_cost(d, S, w))
+        assert np.isclose(true_cost(d, S, w), true_cost(d_rep, S_rep, 1))
+        assert np.isclose(total_TD, total_TD_rep)
+
+
+def test_weights():
+    run_test(100, 12, 3)
+    run_test(100, 12, 3, maxIter=1)
+    run_test(20, 6, 6)  # every object is a medoid
+
+
+if __name__ == "__main__":
+    test_weights()
+    print("Weighted PAM matches PAM on expanded data")
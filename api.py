@@ -1,21 +1,48 @@
 from flask import Flask, jsonify
 from flask_restful import reqparse, abort, Api, Resource
 from flask_sqlalchemy import SQLAlchemy
-from AprioriDP.AprioriDP import apriori
-from The_PAM_Clustering.PAM import PAM
-import pandas as pd
-import urllib
-import pyodbc
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+import sqlite3
 import os
-import sys
+
+dir_path = os.path.dirname(os.path.realpath(__file__))
 
 # Flask aplication
 app = Flask(__name__)
 
 # SQLAlchemy
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///db\\experiments.db'
+# DATABASE_URL - any SQLAlchemy URI, default - local SQLite database
+default_uri = 'sqlite:///' + os.path.join(dir_path, 'db', 'experiments.db')
+db_uri = os.environ.get('DATABASE_URL', default_uri)
+app.config['SQLALCHEMY_DATABASE_URI'] = db_uri
+app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+if db_uri.startswith('sqlite'):
+    # wait for other workers' writes instead of failing at once
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        'connect_args': {'timeout': 30},
+    }
+else:
+    # pooled connections to database server, size is per worker
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 5)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 10)),
+        'pool_recycle': 3600,
+        'pool_pre_ping': True,
+    }
 db = SQLAlchemy(app)
 
+
+@event.listens_for(Engine, 'connect')
+def set_sqlite_pragma(dbapi_connection, connection_record):
+    '''WAL mode lets readers work alongside a writer in SQLite'''
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.execute('PRAGMA synchronous=NORMAL')
+        cursor.close()
+
+
 # Flask_restful
 api = Api(app)
 
@@ -149,9 +176,12 @@ class Experiment(Resource):
 
         output = []
         if args['algo'] == 'PAM':
+            import pandas as pd  # heavy imports only when experiment runs
+            from The_PAM_Clustering.PAM import PAM
+
             param_string = "algo == %s, k == %d" % ('PAM', args['k'])
 
-            dspath = os.path.abspath('./data/tutors_small.csv')
+            dspath = os.path.join(dir_path, 'data', 'tutors_small.csv')
             ds = pd.read_csv(dspath, sep=';', encoding='utf-8')
 
             max_iter = 10000
@@ -160,7 +190,8 @@ class Experiment(Resource):
             param_string += (", maxIter == " + str(max_iter))
             medidx, clusters, totalDistance = PAM(ds,
                                                   args['k'],
-                                                  maxIter=max_iter)
+                                                  maxIter=max_iter,
+                                                  dedup=['mark'])
 
             for (item, _cluster) in enumerate(clusters):
                 cluster_res = DBClusterResult(experiments=experiment,
@@ -173,6 +204,8 @@ class Experiment(Resource):
                 db.session.add(cluster_res)
                 output.append(cluster_res.tojson())
         else:
+            from AprioriDP.AprioriDP import apriori
+
             param_format = """algo == %s, min_supp == %f, min_conf == %f"""
             param_tuple = ('AprioriDP', args['min_supp'], args['min_conf'])
             param_string = (param_format % param_tuple)
@@ -214,6 +247,7 @@ api.add_resource(ExperimentList, '/experiments',
 api.add_resource(Experiment, '/experiments/<int:exp_id>')
 
 
-if __name__ == '__main__':
-    db.create_all()
+if __name__ == '__main__':  # development server
+    with app.app_context():
+        db.create_all()
     app.run(debug=True)
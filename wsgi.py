@@ -0,0 +1,15 @@
+'''Production entry point, e.g.
+
+    gunicorn --preload --workers 4 --bind 0.0.0.0:8000 wsgi:app
+
+api.py imports the algorithms lazily to keep the development server
+light; they are imported here so that --preload loads pandas and numpy
+once, before the workers fork.
+'''
+from api import app, db
+import The_PAM_Clustering.PAM  # noqa: F401
+import AprioriDP.AprioriDP  # noqa: F401
+
+with app.app_context():
+    db.create_all()
+    db.engine.dispose()  # workers open their own connections after fork